@@ -6,6 +6,12 @@ OLLAMA_URL=${OLLAMA_URL:-"http://localhost:11434"}
 # Parse command line arguments
 MCP_CONFIG=""
 WINDOW_SIZE=""
+REFRESH_MODELS=""
+REFRESH_TOOLS=""
+OLLAMA_TIMEOUT=""
+MCP_TIMEOUT=""
+KEEP_ALIVE=""
+MAX_TOKENS=""
 
 # Process command line arguments
 while [[ $# -gt 0 ]]; do
@@ -18,9 +24,33 @@ while [[ $# -gt 0 ]]; do
       WINDOW_SIZE="$2"
       shift 2
       ;;
+    --refresh-models)
+      REFRESH_MODELS="1"
+      shift
+      ;;
+    --refresh-tools)
+      REFRESH_TOOLS="1"
+      shift
+      ;;
+    --ollama-timeout)
+      OLLAMA_TIMEOUT="$2"
+      shift 2
+      ;;
+    --mcp-timeout)
+      MCP_TIMEOUT="$2"
+      shift 2
+      ;;
+    --keep-alive)
+      KEEP_ALIVE="$2"
+      shift 2
+      ;;
+    --max-tokens)
+      MAX_TOKENS="$2"
+      shift 2
+      ;;
     *)
       echo "Unknown option: $1"
-      echo "Usage: $0 [--mcp-config <config_file>] [--window-size <size>]"
+      echo "Usage: $0 [--mcp-config <config_file>] [--window-size <size>] [--refresh-models] [--refresh-tools] [--ollama-timeout <seconds>] [--mcp-timeout <seconds>] [--keep-alive <duration>] [--max-tokens <tokens>]"
       exit 1
       ;;
   esac
@@ -57,6 +87,24 @@ fi
 if [ -n "$WINDOW_SIZE" ]; then
     CMD="$CMD --window-size $WINDOW_SIZE"
 fi
+if [ -n "$REFRESH_MODELS" ]; then
+    CMD="$CMD --refresh-models"
+fi
+if [ -n "$REFRESH_TOOLS" ]; then
+    CMD="$CMD --refresh-tools"
+fi
+if [ -n "$OLLAMA_TIMEOUT" ]; then
+    CMD="$CMD --ollama-timeout $OLLAMA_TIMEOUT"
+fi
+if [ -n "$MCP_TIMEOUT" ]; then
+    CMD="$CMD --mcp-timeout $MCP_TIMEOUT"
+fi
+if [ -n "$KEEP_ALIVE" ]; then
+    CMD="$CMD --keep-alive $KEEP_ALIVE"
+fi
+if [ -n "$MAX_TOKENS" ]; then
+    CMD="$CMD --max-tokens $MAX_TOKENS"
+fi
 
 # Run the application
 echo "Running: $CMD"
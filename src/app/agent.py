@@ -4,63 +4,153 @@ Interactive demo for strands library with Ollama integration and MCP client supp
 """
 
 import os
+import re
+import sys
+import json
+import atexit
+import collections
 import subprocess
+import tempfile
+import http.client
+import urllib.request
 import argparse
 import readline
-import contextlib
-from strands import Agent
-from strands.models.ollama import OllamaModel
-from strands.agent.conversation_manager import SlidingWindowConversationManager
-from strands_tools import current_time
 from .mcp_client_manager import MCPClientManager
 from .mcp_config import MCPConfigManager
 from .banner import print_banner
+from .cache import get_cache_path, read_cache, write_cache, clear_cache
+
+# Cached Ollama model list, invalidated by TTL or by changes to the local model store
+MODELS_CACHE_PATH = get_cache_path("models.json")
+MODELS_CACHE_TTL = 60
+
+# Readline history bounds
+# Header line libedit (the macOS readline) writes at the top of its history files
+HISTORY_LIBEDIT_HEADER = b"_HiStOrY_V2_"
+HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".strands_agent_history")
+HISTORY_LENGTH = 1000
+
+# Interactive loop commands
+_EXIT_CMDS = frozenset({'exit', 'quit'})
+_CLEAR_CMDS = frozenset({'clear', 'cls'})
+
+# Duration accepted by Ollama's keep_alive, e.g. "30m", "1.5h" or "1h30m"
+_DURATION_RE = re.compile(r"^-?(\d+(\.\d+)?(ns|us|µs|ms|s|m|h))+$")
+
+def is_interactive():
+    """Check whether the agent is reading input from a terminal"""
+    return sys.stdin.isatty()
 
-# Set up Ctrl+L to clear screen
 def clear_screen(event=None):
     """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if os.name == 'nt':
+        os.system('cls')  # Windows consoles don't always honor ANSI escapes
+    else:
+        # Clear the screen and move the cursor home without spawning `clear`
+        sys.stdout.write('\x1b[2J\x1b[H')
+        sys.stdout.flush()
     print_banner()  # Reprint the banner after clearing
     return None
 
-# Configure readline to handle Ctrl+L
-readline.parse_and_bind(r'"\C-l": clear_screen')
+def get_ollama_models_dir_mtime():
+    """
+    Get the latest modification time of the local Ollama model manifests
+
+    `ollama pull` and `ollama rm` add or remove manifest files, which updates the
+    mtime of their parent directory, so the newest directory mtime tells us when
+    the installed model set last changed.
+
+    Returns:
+        float or None if the Ollama models directory does not exist
+    """
+    models_dir = os.environ.get("OLLAMA_MODELS", os.path.join(os.path.expanduser("~"), ".ollama", "models"))
+    manifests_dir = os.path.join(models_dir, "manifests")
+    if not os.path.isdir(manifests_dir):
+        return None
+
+    latest = os.path.getmtime(manifests_dir)
+    for root, dirs, _ in os.walk(manifests_dir):
+        for name in dirs:
+            try:
+                latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+            except OSError:
+                pass
+    return latest
+
+def get_ollama_models_with_tags(ollama_url="http://localhost:11434", timeout=2.0):
+    """
+    Get list of available Ollama models with their tags, using a short-lived cache
+
+    Args:
+        ollama_url: Base URL of the Ollama server to query
+        timeout: Seconds to wait for the Ollama API before falling back to the CLI
+
+    Returns:
+        List of (full model name, model name, tag) tuples
+    """
+    cached = read_cache(MODELS_CACHE_PATH, MODELS_CACHE_TTL, not_before=get_ollama_models_dir_mtime())
+    if isinstance(cached, dict) and cached.get("url") == ollama_url and cached.get("models"):
+        return [tuple(model) for model in cached["models"]]
+
+    try:
+        models = _fetch_ollama_models(ollama_url, timeout)
+    except (OSError, ValueError, http.client.HTTPException) as e:
+        print(f"Could not query Ollama API at {ollama_url}: {e}")
+        print("Falling back to the ollama command line")
+        models = _list_ollama_models()
+
+    if models:
+        write_cache(MODELS_CACHE_PATH, {"url": ollama_url, "models": models})
+    return models or [("llama3", "llama3", "latest")]
+
+def _fetch_ollama_models(ollama_url, timeout):
+    """Get list of available Ollama models with their tags from the Ollama /api/tags endpoint"""
+    url = ollama_url.rstrip("/") + "/api/tags"
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        data = json.load(response)
 
-def get_ollama_models_with_tags():
+    if not isinstance(data, dict) or not isinstance(data.get("models", []), list):
+        raise ValueError(f"unexpected response from {url}")
+
+    models = []
+    for model in data.get("models", []):
+        if not isinstance(model, dict) or not isinstance(model.get("name"), str):
+            raise ValueError(f"unexpected model entry from {url}: {model!r}")
+        full_model_name = model["name"]
+        model_name, _, tag = full_model_name.partition(':')
+        models.append((full_model_name, model_name, tag or "default"))
+    if not models:
+        print("No Ollama models found")
+    return models
+
+def _list_ollama_models():
     """Get list of available Ollama models with their tags by parsing ollama list output"""
     try:
-        result = subprocess.run(['ollama', 'list'], 
-                               capture_output=True, text=True, check=True)
-        
-        # Parse the output to extract model names and tags
-        lines = result.stdout.strip().split('\n')
-        if len(lines) <= 1:  # Only header line or empty
-            print("No Ollama models found")
-            return [("llama3", "llama3", "latest")]  # Default fallback
-            
         models = []
-        # Skip the header line (first row)
-        for line in lines[1:]:
-            if line.strip():
+        # Parse the output line by line as it is produced instead of buffering it all
+        with subprocess.Popen(['ollama', 'list'], stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, text=True) as process:
+            # Skip the header line (first row)
+            next(process.stdout, None)
+            for line in process.stdout:
                 # Extract the model name (first column)
-                parts = line.split()
-                if parts:
-                    full_model_name = parts[0]
-                    # Handle model with tag
-                    if ':' in full_model_name:
-                        model_name, tag = full_model_name.split(':', 1)
-                    else:
-                        model_name = full_model_name
-                        tag = "default"
-                    
-                    # Add model with its tag
-                    models.append((full_model_name, model_name, tag))
-                
-        return models if models else [("llama3", "llama3", "latest")]
-    except subprocess.SubprocessError as e:
+                parts = line.split(None, 1)
+                if not parts:
+                    continue
+                full_model_name = parts[0]
+                # Handle model with tag
+                model_name, _, tag = full_model_name.partition(':')
+                models.append((full_model_name, model_name, tag or "default"))
+
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, process.args)
+        if not models:
+            print("No Ollama models found")
+        return models
+    except (subprocess.SubprocessError, OSError) as e:
         print(f"Error getting Ollama models: {e}")
         print("Falling back to default model (llama3)")
-        return [("llama3", "llama3", "latest")]
+        return []
 
 def display_model_menu(models):
     """Display a menu for model selection"""
@@ -79,35 +169,104 @@ def display_model_menu(models):
         except ValueError:
             print("Please enter a valid number")
 
+def load_history(history_file):
+    """
+    Load at most HISTORY_LENGTH entries from the readline history file
+
+    Only the last HISTORY_LENGTH lines are kept while reading, since
+    readline.set_history_length does not bound read_history_file. Longer
+    files are loaded through a temporary file holding just that tail, so
+    readline still decodes the entries in its own file format.
+
+    Args:
+        history_file: Path of the history file to load
+    """
+    with open(history_file, 'rb') as f:
+        first_line = f.readline()
+        header = first_line if first_line.startswith(HISTORY_LIBEDIT_HEADER) else b""
+        # One extra slot tells whether the file holds more entries than we keep
+        entries = collections.deque([] if header else [first_line], maxlen=HISTORY_LENGTH + 1)
+        entries.extend(f)
+
+    if len(entries) <= HISTORY_LENGTH:
+        readline.read_history_file(history_file)
+        return
+
+    entries.popleft()
+    fd, tail_file = tempfile.mkstemp(suffix=".history")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.writelines(entries)
+        readline.clear_history()
+        readline.read_history_file(tail_file)
+    finally:
+        os.unlink(tail_file)
+
+def save_history(history_file):
+    """
+    Write the readline history file, keeping only the last HISTORY_LENGTH entries
+
+    Args:
+        history_file: Path of the history file to write
+    """
+    try:
+        # Re-apply the bound so the file is truncated on write and never grows unbounded
+        readline.set_history_length(HISTORY_LENGTH)
+        readline.write_history_file(history_file)
+    except OSError:
+        pass
+
 def setup_readline():
     """Configure readline for better input handling"""
-    # Set up history file
-    history_file = os.path.join(os.path.expanduser("~"), ".strands_agent_history")
+    # History and key bindings are only useful when a user is typing
+    if not is_interactive():
+        return
+
+    # Truncate the history file to HISTORY_LENGTH entries when it is written back
+    readline.set_history_length(HISTORY_LENGTH)
+
+    history_loaded = True
     try:
         # Try to read history file if it exists
-        if os.path.exists(history_file):
-            try:
-                readline.read_history_file(history_file)
-                # Set history length
-                readline.set_history_length(1000)
-            except (FileNotFoundError, PermissionError) as e:
-                print(f"Note: Could not read history file: {e}")
+        if os.path.exists(HISTORY_FILE):
+            load_history(HISTORY_FILE)
+    except OSError as e:
+        print(f"Note: Could not read history file: {e}")
+        history_loaded = False
     except Exception as e:
         print(f"Note: History functionality limited: {e}")
-    
-    try:
-        # Save history on exit
-        import atexit
-        atexit.register(readline.write_history_file, history_file)
-    except Exception:
-        pass
-    
+        history_loaded = False
+
+    # Save history on exit, unless loading failed and saving could clobber the file
+    if history_loaded:
+        atexit.register(save_history, HISTORY_FILE)
+
     # Set up Ctrl+L to clear screen
     try:
         readline.parse_and_bind(r'"\C-l": "clear\n"')
     except Exception:
         print("Note: Ctrl+L shortcut not available. Use 'clear' command instead.")
 
+def parse_keep_alive(value):
+    """
+    Parse an Ollama keep-alive value
+
+    Args:
+        value: Seconds as an integer (negative keeps the model loaded forever) or a duration such as "30m"
+
+    Returns:
+        int or str: The value in the form expected by the Ollama API
+    """
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    if not _DURATION_RE.match(value):
+        raise argparse.ArgumentTypeError(
+            f"invalid keep-alive value {value!r}: expected seconds (e.g. 300) or a duration (e.g. 30m, 1h30m)")
+    return value
+
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description="Strands Agent Demo with Ollama and MCP support")
@@ -115,6 +274,19 @@ def parse_arguments():
                         help="Path to MCP server configuration file (optional)")
     parser.add_argument("--window-size", type=int, default=10,
                         help="Size of the conversation history window (default: 10)")
+    parser.add_argument("--refresh-models", action="store_true",
+                        help="Ignore the cached Ollama model list and query Ollama again")
+    parser.add_argument("--refresh-tools", action="store_true",
+                        help="Ignore the cached MCP tool lists and query the MCP servers again")
+    parser.add_argument("--ollama-timeout", type=float, default=2.0,
+                        help="Seconds to wait for the Ollama API when listing models (default: 2)")
+    parser.add_argument("--mcp-timeout", type=float, default=10.0,
+                        help="Seconds to wait for each MCP server to list its tools, retried once (default: 10)")
+    parser.add_argument("--max-tokens", type=int, default=None,
+                        help="Also trim the conversation history to about this many tokens (default: no limit)")
+    parser.add_argument("--keep-alive", type=parse_keep_alive, default=-1,
+                        help="How long Ollama keeps the model loaded between requests, in seconds "
+                             "or as a duration like '30m'; negative keeps it loaded (default: -1)")
     return parser.parse_args()
 
 def main():
@@ -129,6 +301,8 @@ def main():
     
     print("Starting Strands Agent Demo with Ollama and MCP support")
     print(f"Conversation history window size: {args.window_size}")
+    if args.max_tokens:
+        print(f"Conversation history token budget: {args.max_tokens}")
     
     # Load MCP configuration if provided
     mcp_config_manager = MCPConfigManager(args.mcp_config)
@@ -142,37 +316,42 @@ def main():
     print(f"Using Ollama server at: {ollama_url}")
     
     # Get available models with tags and let user select one
-    models = get_ollama_models_with_tags()
+    if args.refresh_models:
+        clear_cache(MODELS_CACHE_PATH)
+    models = get_ollama_models_with_tags(ollama_url, timeout=args.ollama_timeout)
     selected_model = display_model_menu(models)
     print(f"Selected model: {selected_model}")
     
+    # Import the Strands stack only once it is needed, so --help and early exits stay fast
+    from strands import Agent
+    from strands.models.ollama import OllamaModel
+    from strands.agent.conversation_manager import SlidingWindowConversationManager
+    from strands_tools import current_time
+    
     # Create an Ollama model instance with the selected model
+    # Keeping the model loaded lets follow-up turns skip the model load
     model = OllamaModel(
         host=ollama_url,
-        model_id=selected_model
+        model_id=selected_model,
+        keep_alive=args.keep_alive
     )
     
-    # Create a conversation manager with the specified window size
-    conversation_manager = SlidingWindowConversationManager(window_size=args.window_size)
+    # Create a conversation manager with the specified window size, bounded by tokens if requested
+    if args.max_tokens:
+        from .conversation import TokenWindowConversationManager
+        conversation_manager = TokenWindowConversationManager(window_size=args.window_size, max_tokens=args.max_tokens)
+    else:
+        conversation_manager = SlidingWindowConversationManager(window_size=args.window_size)
     
     # Create mcp clients
     print("Creating MCP clients...")
-    clients = mcp_manager.create_clients()
+    mcp_manager.create_clients()
     
-    agent = Agent(model=model, conversation_manager=conversation_manager, tools=[current_time]) #new
-    with contextlib.ExitStack() as stack:
-        # tools = []
-        for client in clients:
-            stack.enter_context(client)
-
-            # List the tools available on the MCP server...
-            mcp_tools = client.list_tools_sync() #new
-            print(f"Available tools: {[tool.tool_name for tool in mcp_tools]}") #new
-            
-            agent.tool_registry.process_tools(mcp_tools)
-            # tools.extend(client.list_tools_sync())
-            
-        # agent = Agent(model=model, tools=tools, conversation_manager=conversation_manager)
+    with mcp_manager:
+        # List the tools of the already connected MCP servers, from cache when still fresh,
+        # and hand them to the agent in one go
+        mcp_tools = mcp_manager.list_all_tools(refresh=args.refresh_tools, timeout=args.mcp_timeout)
+        agent = Agent(model=model, conversation_manager=conversation_manager, tools=[current_time, *mcp_tools])
     
         # Run the interactive loop
         print("Press Ctrl+C or Ctrl+D to exit at any time")
@@ -181,33 +360,62 @@ def main():
         
     print("\nThank you for using Demo-Strands-Agent!")
 
+def read_user_input(interactive):
+    """
+    Read one line of user input
+
+    Args:
+        interactive: Whether to prompt the user through input() or read plain lines from stdin
+
+    Returns:
+        str: The line entered by the user
+
+    Raises:
+        EOFError: If the input is exhausted
+    """
+    if interactive:
+        return input("\nYou: ")
+
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip('\n')
+
 def run_basic_agent(agent):
     """Run a basic agent interaction loop"""
-    try:
-        while True:
-            # Get user input
-            try:
-                user_input = input("\nYou: ")
-            except EOFError:  # Handle Ctrl+D
-                print("\nExiting...")
-                break
-                
-            # Check if user wants to exit
-            if user_input.lower() in ['exit', 'quit']:
-                break
-                
-            # Handle clear screen command
-            if user_input.lower() in ['clear', 'cls']:
-                clear_screen()
-                continue
-            
-            # Show that the model is answering
-            print("\nThinking...")
-            
-            # Ask the agent - it will print the response automatically
+    interactive = is_interactive()
+    # Bind per-turn lookups once, outside the loop
+    exit_cmds, clear_cmds = _EXIT_CMDS, _CLEAR_CMDS
+    write, flush = sys.stdout.write, sys.stdout.flush
+    while True:
+        # Get user input
+        try:
+            user_input = read_user_input(interactive)
+        except (EOFError, KeyboardInterrupt):  # Handle Ctrl+D / Ctrl+C
+            print("\nExiting...")
+            break
+
+        command = user_input.lower()
+
+        # Check if user wants to exit
+        if command in exit_cmds:
+            break
+
+        # Handle clear screen command
+        if command in clear_cmds:
+            clear_screen()
+            continue
+
+        # Show that the model is answering
+        write("\nThinking...\n")
+        flush()
+
+        # Ask the agent - it will print the response automatically
+        try:
             agent(user_input)
-    except KeyboardInterrupt:  # Handle Ctrl+C
-        print("\nExiting...")
+        except KeyboardInterrupt:  # Handle Ctrl+C while the agent is answering
+            print("\nExiting...")
+            break
 
 if __name__ == "__main__":
     try:
@@ -3,36 +3,39 @@
 Banner display for the Demo Strands Agent
 """
 
-from .version import VERSION
+import sys
 
+from .version import VERSION
 
-def get_banner():
-    """
-    Generate a banner with the application name and version
-    
-    Returns:
-        str: The banner text
-    """
-    banner = r"""
+# The banner never changes at runtime, so assemble it once at import
+_BANNER = r"""
 ____  _____ __  _____      _____ _____ ____      _    _   _ ____  ____       _    ____ _____ _   _ _____ 
 |  _ \| ____|  \/  / _ \    / ____|_   _|  _ \    / \  | \ | |  _ \/ ___|     / \  / ___| ____| \ | |_   _|
 | | | |  _| | |\/| | | | |  \___ \  | | | |_) |  / _ \ |  \| | | | \___ \    / _ \| |  _|  _| |  \| | | |  
 | |_| | |___| |  | | |_| |   ___) | | | |  _ <  / ___ \| |\  | |_| |___) |  / ___ \ |_| | |___| |\  | | |  
 |____/|_____|_|  |_|\___/   |____/  |_| |_| \_\/_/   \_\_| \_|____/|____/  /_/   \_\____|_____|_| \_| |_|  
                                                                                                           
+""" f"""
+v{VERSION}
 """
+# print_banner ends with a blank line, as print(get_banner()) would
+_PRINTED_BANNER = _BANNER + "\n"
+
+
+def get_banner():
+    """
+    Get the banner with the application name and version
     
-    version_line = f"v{VERSION}"
-    
-    # Add the version line left-aligned under the banner
-    banner += "\n" + version_line + "\n"
-    
-    return banner
+    Returns:
+        str: The banner text
+    """
+    return _BANNER
 
 
 def print_banner():
     """Print the banner to the console"""
-    print(get_banner())
+    sys.stdout.write(_PRINTED_BANNER)
+    sys.stdout.flush()
 
 
 if __name__ == "__main__":
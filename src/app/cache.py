@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Small on-disk JSON cache used to speed up agent startup
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import Any, Optional
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "strands_agent")
+
+
+def get_cache_path(*parts: str) -> str:
+    """
+    Build a path inside the application cache directory
+
+    Args:
+        *parts: Path components relative to the cache directory
+
+    Returns:
+        str: The absolute cache file path
+    """
+    return os.path.join(CACHE_DIR, *parts)
+
+
+def read_cache(path: str, ttl: float, not_before: Optional[float] = None) -> Optional[Any]:
+    """
+    Read a JSON cache file if it is still fresh
+
+    Args:
+        path: Path of the cache file
+        ttl: Maximum age of the cache file in seconds
+        not_before: Optional timestamp; the cache is stale if it was written before it
+
+    Returns:
+        The cached data, or None if the cache is missing, expired or unreadable
+    """
+    try:
+        cache_mtime = os.path.getmtime(path)
+        if time.time() - cache_mtime >= ttl:
+            return None
+        if not_before is not None and not_before > cache_mtime:
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache(path: str, data: Any) -> None:
+    """
+    Atomically write data to a JSON cache file
+
+    The data is written to a temporary file in the same directory and then
+    moved into place, so readers never see a partially written cache.
+
+    Args:
+        path: Path of the cache file
+        data: JSON serializable data to store
+    """
+    try:
+        cache_dir = os.path.dirname(path)
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Note: Could not write cache file {path}: {e}")
+
+
+def clear_cache(path: str) -> None:
+    """
+    Remove a cache file if it exists
+
+    Args:
+        path: Path of the cache file
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Token-aware conversation history management for the Demo Strands Agent
+"""
+
+import json
+from typing import Any
+
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(messages: list) -> int:
+    """
+    Estimate the number of tokens in a list of messages
+
+    Text blocks are counted by their length; any other content block
+    (tool use, tool results, images...) by the length of its JSON form.
+
+    Args:
+        messages: Conversation messages in Strands format
+
+    Returns:
+        int: Approximate token count
+    """
+    chars = 0
+    for message in messages:
+        for block in message.get("content", []):
+            if "text" in block:
+                chars += len(block["text"])
+            else:
+                chars += len(json.dumps(block, default=str))
+    return chars // CHARS_PER_TOKEN
+
+
+def _last_question_index(messages: list) -> int:
+    """
+    Find the latest user message that is a question rather than a tool result
+
+    Args:
+        messages: Conversation messages in Strands format
+
+    Returns:
+        int: Index of the message, or -1 if there is none
+    """
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if message["role"] == "user" and not any("toolResult" in block for block in message.get("content", [])):
+            return index
+    return -1
+
+
+class TokenWindowConversationManager(SlidingWindowConversationManager):
+    """Sliding window conversation manager that also bounds the history by estimated tokens"""
+
+    def __init__(self, window_size: int = 40, max_tokens: int = 4096, **kwargs: Any):
+        """
+        Args:
+            window_size: Maximum number of messages to keep in the history
+            max_tokens: Maximum estimated number of tokens to keep in the history
+            **kwargs: Additional arguments for SlidingWindowConversationManager
+        """
+        super().__init__(window_size=window_size, **kwargs)
+        self.max_tokens = max_tokens
+
+    def apply_management(self, agent: Any, **kwargs: Any) -> None:
+        """
+        Apply the message window, then evict the oldest turns until the history fits the token budget
+
+        The latest user question and everything after it, including its tool calls, are always kept.
+
+        Args:
+            agent: The agent whose messages will be managed in place
+            **kwargs: Additional keyword arguments for future extensibility
+        """
+        super().apply_management(agent, **kwargs)
+
+        messages = agent.messages
+        while len(messages) > 2 and estimate_tokens(messages) > self.max_tokens:
+            # reduce_context trims up to the first valid trim point at or after start_index; once the
+            # latest question lies before it, trimming would cut into the current turn
+            start_index = 2 if len(messages) <= self.window_size else len(messages) - self.window_size
+            if _last_question_index(messages) < start_index:
+                break
+            message_count = len(messages)
+            self.reduce_context(agent)
+            if len(messages) == message_count:
+                # No valid trim point left, keep what we have
+                break
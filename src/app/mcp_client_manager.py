@@ -3,30 +3,133 @@
 MCP Client manager for creating and managing MCP clients
 """
 
-from typing import Optional
+import hashlib
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
-from mcp import stdio_client, StdioServerParameters
-from strands.tools.mcp import MCPClient
-from strands import Agent
+from .cache import get_cache_path, read_cache, write_cache
+from .mcp_config import MCPConfigManager, MCPServerConfig
 
-from .mcp_config import MCPConfigManager
+if TYPE_CHECKING:
+    from strands.tools.mcp import MCPAgentTool, MCPClient
+
+__all__ = ["MCPClientManager", "get_tools_cache_path"]
+
+# How long a server's tool list is reused before asking the server again
+TOOLS_CACHE_TTL = 600
+
+# Upper bound on the number of servers queried concurrently
+MAX_PARALLEL_SERVERS = 8
+
+
+def get_tools_cache_path(server_config: MCPServerConfig) -> str:
+    """
+    Get the tool list cache file for a server configuration
+
+    The file name is a hash of the command, arguments and environment, so
+    any change to how the server is launched uses a fresh cache entry.
+
+    Args:
+        server_config: Configuration of the MCP server
+
+    Returns:
+        str: Path of the cache file
+    """
+    key = json.dumps([server_config.command, server_config.args, sorted((server_config.env or {}).items())])
+    return get_cache_path("tools", hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+
+def _wait_for_attempts(futures: Dict[str, List[Future]], timeout: Optional[float]) -> None:
+    """
+    Wait until every server has at least one finished attempt, or the timeout expires
+
+    Args:
+        futures: The pending attempts of each server
+        timeout: Seconds to wait in total, or None to wait indefinitely
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        pending = [f for attempts in futures.values() if not any(a.done() for a in attempts) for f in attempts]
+        if not pending:
+            return
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            return
+        wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
 
 
 class MCPClientManager:
     """Manager for creating and managing MCP clients"""
     
-    def __init__(self, config_manager: Optional[MCPConfigManager] = None):
+    def __init__(self, config_manager: Optional[Union[MCPConfigManager, str]] = None):
+        """
+        Args:
+            config_manager: An MCPConfigManager, or the path of an MCP configuration
+                file to load into a new one
+        """
+        if isinstance(config_manager, str):
+            config_manager = MCPConfigManager(config_manager)
+            config_manager.load_config()
         self.config_manager = config_manager
+        self.clients: Dict[str, "MCPClient"] = {}
+        self._started_clients: List[str] = []
+    
+    def __enter__(self) -> "MCPClientManager":
+        """
+        Start all MCP clients in parallel
+
+        Each client spawns its server process and performs the MCP handshake,
+        so starting them concurrently takes as long as the slowest server.
+        Servers that fail to start are reported and removed from the clients.
+        """
+        self._started_clients = []
+        if not self.clients:
+            return self
+
+        with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_SERVERS, len(self.clients))) as executor:
+            futures = {name: executor.submit(client.__enter__) for name, client in self.clients.items()}
+            for server_name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error starting MCP server '{server_name}': {e}")
+                    continue
+                self._started_clients.append(server_name)
+
+        self.clients = {name: self.clients[name] for name in self._started_clients}
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        """Stop all started MCP clients in parallel"""
+        if self._started_clients:
+            with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_SERVERS, len(self._started_clients))) as executor:
+                futures = {
+                    name: executor.submit(self.clients[name].__exit__, exc_type, exc_value, traceback)
+                    for name in self._started_clients
+                }
+                for server_name, future in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Error stopping MCP server '{server_name}': {e}")
+        self._started_clients = []
+        return False
     
-    def create_clients(self) -> Agent:
+    def create_clients(self) -> List["MCPClient"]:
         """
         Create MCPClient instances based on the loaded configurations.
         Each config should provide 'command', 'args', and 'env' keys.
         """
+        # Imported here so that loading this module does not pull in the MCP stack
+        from mcp import stdio_client, StdioServerParameters
+        from strands.tools.mcp import MCPClient
+
         if not self.config_manager:
             raise Exception("MCPConfigManager is missing. Cannot create clients.")
 
-        clients = []
+        self.clients = {}
         for server_name in self.config_manager.list_servers():
             server_config = self.config_manager.get_server_config(server_name)
             if not server_config:
@@ -35,6 +138,93 @@ class MCPClientManager:
                 raise Exception(f"Server config for {server_name} is missing 'command' or 'args'.")
             if server_config.env is None:
                 server_config.env = {}
-            # Create a new MCPClient instance for each server configuration
-            clients.append(MCPClient(lambda: stdio_client(StdioServerParameters(command=server_config.command, args=server_config.args, env=server_config.env))))
-        return clients
\ No newline at end of file
+            # Create a new MCPClient instance for each server configuration. The config
+            # values are bound as defaults so each factory keeps its own server's settings.
+            self.clients[server_name] = MCPClient(
+                lambda cmd=server_config.command, args=server_config.args, env=server_config.env:
+                    stdio_client(StdioServerParameters(command=cmd, args=args, env=env))
+            )
+        return list(self.clients.values())
+
+    def list_tools(self, server_name: str, refresh: bool = False) -> List["MCPAgentTool"]:
+        """
+        List the tools of a started MCP client, reusing a cached tool list when possible
+
+        Args:
+            server_name: Name of the server whose client should be queried
+            refresh: Ignore the cached tool list and query the server
+
+        Returns:
+            List of tools exposed by the server
+        """
+        from mcp.types import Tool
+        from strands.tools.mcp import MCPAgentTool
+
+        client = self.clients[server_name]
+        cache_path = get_tools_cache_path(self.config_manager.get_server_config(server_name))
+        if not refresh:
+            cached = read_cache(cache_path, TOOLS_CACHE_TTL)
+            if cached is not None:
+                try:
+                    return [MCPAgentTool(Tool.model_validate(tool), client) for tool in cached]
+                except (ValueError, TypeError) as e:
+                    # Corrupt entry or a changed Tool schema: ask the server and rewrite the cache
+                    print(f"Note: Ignoring cached tool list for MCP server '{server_name}': {e}")
+
+        tools = client.list_tools_sync()
+        write_cache(cache_path, [tool.mcp_tool.model_dump(mode="json") for tool in tools])
+        return tools
+
+    def list_all_tools(self, refresh: bool = False, timeout: Optional[float] = None) -> List["MCPAgentTool"]:
+        """
+        List the tools of all MCP clients, querying the servers in parallel
+
+        The clients must already be started by entering the manager; listing
+        reuses those connections instead of opening new ones. Servers that do
+        not answer within the timeout are all asked once more together, and
+        whichever attempt answers first is used; servers that still time out
+        or fail to list their tools are reported and skipped.
+
+        Args:
+            refresh: Ignore the cached tool lists and query the servers
+            timeout: Seconds to wait for the tool lists, and again for the retries, or None to wait indefinitely
+
+        Returns:
+            List of tools exposed by all servers, in server order
+        """
+        if not self.clients:
+            return []
+
+        all_tools = []
+        # Twice the workers so a retry never queues behind a call that timed out
+        executor = ThreadPoolExecutor(max_workers=2 * min(MAX_PARALLEL_SERVERS, len(self.clients)))
+        try:
+            futures = {name: [executor.submit(self.list_tools, name, refresh)] for name in self.clients}
+            # All servers share one wait, then the ones that timed out share one retry, so hung
+            # servers cost at most two timeouts in total rather than two each
+            _wait_for_attempts(futures, timeout)
+            timed_out = [name for name, attempts in futures.items() if not any(f.done() for f in attempts)]
+            for server_name in timed_out:
+                print(f"MCP server '{server_name}' did not list its tools within {timeout}s, retrying")
+                futures[server_name].append(executor.submit(self.list_tools, server_name, refresh))
+            if timed_out:
+                _wait_for_attempts({name: futures[name] for name in timed_out}, timeout)
+
+            for server_name, attempts in futures.items():
+                done = [future for future in attempts if future.done()]
+                if not done:
+                    print(f"Skipping MCP server '{server_name}': no tool list within {timeout}s")
+                    continue
+                # Take whichever attempt finished, preferring one that succeeded
+                future = next((f for f in done if f.exception() is None), done[0])
+                try:
+                    tools = future.result()
+                except Exception as e:
+                    print(f"Error listing tools from MCP server '{server_name}': {e}")
+                    continue
+                print(f"Available tools from {server_name}: {[tool.tool_name for tool in tools]}")
+                all_tools.extend(tools)
+        finally:
+            # Don't block on servers that timed out; their calls end when the clients stop
+            executor.shutdown(wait=False)
+        return all_tools
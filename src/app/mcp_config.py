@@ -3,10 +3,32 @@
 MCP Server configuration loader and manager
 """
 
+import functools
 import json
 import os
 from typing import Dict, List, Optional
 
+# Use orjson for parsing when it is installed; it is a drop-in for json.loads here
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# Fields every server configuration must define
+_REQUIRED_KEYS = frozenset({'command', 'args'})
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_config_file(path: str, mtime_ns: int, size: int) -> Dict[str, dict]:
+    """
+    Parse a configuration file, memoized on its path, modification time and size
+
+    The mtime and size are only part of the cache key, so that a changed file
+    is parsed again. Callers must not mutate the returned data.
+    """
+    with open(path, 'rb') as f:
+        return json_loads(f.read())
+
 
 class MCPServerConfig:
     """Class representing a single MCP server configuration"""
@@ -40,27 +62,10 @@ class MCPConfigManager:
                 print(f"MCP configuration file not found: {self.config_path}")
                 return False
                 
-            with open(self.config_path, 'r') as f:
-                config_data = json.load(f)
-            
-            # Clear existing configurations
-            self.servers.clear()
-            
-            # Process each server configuration
-            for server_name, server_config in config_data.items():
-                if not all(key in server_config for key in ['command', 'args']):
-                    print(f"Warning: Invalid configuration for server '{server_name}'. "
-                          f"Missing required fields.")
-                    continue
-                
-                # Create server config object
-                self.servers[server_name] = MCPServerConfig(
-                    name=server_name,
-                    command=server_config['command'],
-                    args=server_config['args'],
-                    env=server_config.get('env', {})
-                )
+            stat = os.stat(self.config_path)
+            config_data = _parse_config_file(self.config_path, stat.st_mtime_ns, stat.st_size)
             
+            self._load_servers(config_data)
             return True
             
         except json.JSONDecodeError as e:
@@ -70,6 +75,53 @@ class MCPConfigManager:
             print(f"Error loading MCP configuration: {e}")
             return False
     
+    @classmethod
+    def load_from_dict(cls, config_data: Dict[str, dict]) -> "MCPConfigManager":
+        """
+        Create a manager from already parsed configuration data
+        
+        Args:
+            config_data: Server configurations keyed by server name, as in the JSON file
+            
+        Returns:
+            MCPConfigManager with the servers loaded
+        """
+        manager = cls()
+        manager._load_servers(config_data)
+        return manager
+    
+    def _load_servers(self, config_data: Dict[str, dict]) -> None:
+        """
+        Replace the loaded server configurations with the given data
+        
+        Args:
+            config_data: Server configurations keyed by server name
+        """
+        # Clear existing configurations
+        self.servers.clear()
+        
+        # Process each server configuration
+        for server_name, server_config in config_data.items():
+            if isinstance(server_config, dict):
+                missing = _REQUIRED_KEYS - server_config.keys()
+            else:
+                missing = _REQUIRED_KEYS
+            if missing:
+                print(f"Warning: Invalid configuration for server '{server_name}'. "
+                      f"Missing required fields: {sorted(missing)}")
+                continue
+            
+            # Create server config object, copying the containers so the
+            # (possibly cached) parsed data is never shared or mutated
+            args = server_config['args']
+            env = server_config.get('env', {})
+            self.servers[server_name] = MCPServerConfig(
+                name=server_name,
+                command=server_config['command'],
+                args=list(args) if isinstance(args, list) else args,
+                env=dict(env) if isinstance(env, dict) else env
+            )
+    
     def get_server_config(self, server_name: str) -> Optional[MCPServerConfig]:
         """
         Get configuration for a specific server
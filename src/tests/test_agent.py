@@ -2,83 +2,299 @@
 """
 Unit tests for agent.py (main logic, argument parsing, and agent loop)
 """
+import io
+import os
+import argparse
+import json
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock, call
+import http.client
+import urllib.error
+from unittest.mock import patch, MagicMock, call, DEFAULT
 from app import agent
 import sys
 
 class TestAgentMain(unittest.TestCase):
-    @patch("app.agent.parse_arguments")
-    @patch("app.agent.setup_readline")
-    @patch("app.agent.print_banner")
-    @patch("app.agent.MCPConfigManager")
-    @patch("app.agent.MCPClientManager")
-    @patch("app.agent.get_ollama_models_with_tags")
-    @patch("app.agent.display_model_menu")
-    @patch("app.agent.OllamaModel")
-    @patch("app.agent.SlidingWindowConversationManager")
-    @patch("app.agent.Agent")
-    @patch("app.agent.run_basic_agent")
-    def test_main_happy_path(self, mock_run_basic_agent, mock_Agent, mock_SlidingWindowConversationManager,
-                            mock_OllamaModel, mock_display_model_menu, mock_get_ollama_models_with_tags,
-                            mock_MCPClientManager, mock_MCPConfigManager, mock_print_banner, mock_setup_readline, mock_parse_arguments):
+    @patch("strands.models.ollama.OllamaModel")
+    @patch("strands.agent.conversation_manager.SlidingWindowConversationManager")
+    @patch("strands.Agent")
+    @patch.multiple("app.agent",
+                    parse_arguments=DEFAULT, setup_readline=DEFAULT, print_banner=DEFAULT,
+                    MCPConfigManager=DEFAULT, MCPClientManager=DEFAULT,
+                    get_ollama_models_with_tags=DEFAULT, display_model_menu=DEFAULT,
+                    run_basic_agent=DEFAULT)
+    def test_main_happy_path(self, mock_Agent, mock_SlidingWindowConversationManager, mock_OllamaModel, **mocks):
         # Setup mocks
         mock_args = MagicMock()
         mock_args.mcp_config = None
         mock_args.window_size = 5
-        mock_parse_arguments.return_value = mock_args
-        mock_MCPConfigManager.return_value.load_config.return_value = True
+        mock_args.refresh_models = False
+        mock_args.refresh_tools = False
+        mock_args.ollama_timeout = 2.0
+        mock_args.mcp_timeout = 10.0
+        mock_args.keep_alive = -1
+        mock_args.max_tokens = None
+        mocks["parse_arguments"].return_value = mock_args
+        mocks["MCPConfigManager"].return_value.load_config.return_value = True
         mock_manager = MagicMock()
         mock_client = MagicMock()
-        mock_client.list_tools_sync.return_value = ["tool1", "tool2"]
-        mock_manager.create_clients.return_value = [mock_client]
-        mock_MCPClientManager.return_value = mock_manager
-        mock_get_ollama_models_with_tags.return_value = [("llama3:latest", "llama3", "latest")]
-        mock_display_model_menu.return_value = "llama3:latest"
+        mock_manager.clients = {"server1": mock_client}
+        mock_tools = [MagicMock(tool_name="tool1"), MagicMock(tool_name="tool2")]
+        mock_manager.list_all_tools.return_value = mock_tools
+        mocks["MCPClientManager"].return_value = mock_manager
+        mocks["get_ollama_models_with_tags"].return_value = [("llama3:latest", "llama3", "latest")]
+        mocks["display_model_menu"].return_value = "llama3:latest"
         mock_OllamaModel.return_value = MagicMock()
         mock_SlidingWindowConversationManager.return_value = MagicMock()
         mock_Agent.return_value = MagicMock()
         # Run main
-        agent.main()
-        mock_print_banner.assert_called()
-        mock_run_basic_agent.assert_called()
+        with patch.dict(os.environ, {"OLLAMA_URL": "http://localhost:11434"}):
+            agent.main()
+        mocks["print_banner"].assert_called()
+        mocks["run_basic_agent"].assert_called()
         mock_Agent.assert_called()
         mock_manager.create_clients.assert_called()
-        mock_client.list_tools_sync.assert_called()
+        mock_manager.__enter__.assert_called_once()
+        mock_manager.__exit__.assert_called_once()
+        mock_OllamaModel.assert_called_once_with(host="http://localhost:11434", model_id="llama3:latest", keep_alive=-1)
+        mocks["get_ollama_models_with_tags"].assert_called_once_with("http://localhost:11434", timeout=2.0)
+        mock_manager.list_all_tools.assert_called_once_with(refresh=False, timeout=10.0)
+        # MCP tools are passed to the agent when it is created, not registered afterwards
+        self.assertEqual(mock_Agent.call_args.kwargs["tools"][1:], mock_tools)
+        mock_Agent.return_value.tool_registry.process_tools.assert_not_called()
 
-    @patch("app.agent.input", side_effect=["exit"])
-    def test_run_basic_agent_exit(self, mock_input):
-        mock_agent = MagicMock()
-        agent.run_basic_agent(mock_agent)
-        mock_agent.assert_not_called()  # Should not call agent if user types 'exit' immediately
+    def test_parse_keep_alive(self):
+        self.assertEqual(agent.parse_keep_alive("-1"), -1)
+        self.assertEqual(agent.parse_keep_alive("300"), 300)
+        self.assertEqual(agent.parse_keep_alive("30m"), "30m")
+        self.assertEqual(agent.parse_keep_alive("1h30m"), "1h30m")
+        self.assertEqual(agent.parse_keep_alive("1.5h"), "1.5h")
+        for value in ("abc", "1.5", "m", "30x", ""):
+            with self.subTest(value=value), self.assertRaises(argparse.ArgumentTypeError):
+                agent.parse_keep_alive(value)
+
+    @patch("app.agent.subprocess.Popen")
+    @patch("app.agent.write_cache")
+    @patch("app.agent.read_cache", return_value={"url": "http://localhost:11434", "models": [["llama3:latest", "llama3", "latest"]]})
+    def test_get_models_cache_hit(self, mock_read_cache, mock_write_cache, mock_popen):
+        models = agent.get_ollama_models_with_tags()
+        self.assertEqual(models, [("llama3:latest", "llama3", "latest")])
+        mock_popen.assert_not_called()
+        mock_write_cache.assert_not_called()
+
+    @patch("app.agent.write_cache")
+    @patch("app.agent.read_cache", return_value={"url": "http://other:11434", "models": [["llama3:latest", "llama3", "latest"]]})
+    @patch("app.agent._fetch_ollama_models", return_value=[("mistral", "mistral", "default")])
+    def test_get_models_cache_ignored_for_other_url(self, mock_fetch, mock_read_cache, mock_write_cache):
+        self.assertEqual(agent.get_ollama_models_with_tags(), [("mistral", "mistral", "default")])
+        mock_fetch.assert_called_once()
+
+    @patch("app.agent.subprocess.Popen")
+    @patch("app.agent.write_cache")
+    @patch("app.agent.read_cache", return_value=None)
+    @patch("app.agent.urllib.request.urlopen")
+    def test_get_models_from_api(self, mock_urlopen, mock_read_cache, mock_write_cache, mock_popen):
+        mock_urlopen.return_value = io.BytesIO(json.dumps({
+            "models": [{"name": "llama3:latest"}, {"name": "mistral"}]
+        }).encode())
+        models = agent.get_ollama_models_with_tags("http://ollama:11434/")
+        expected = [("llama3:latest", "llama3", "latest"), ("mistral", "mistral", "default")]
+        self.assertEqual(models, expected)
+        mock_urlopen.assert_called_once_with("http://ollama:11434/api/tags", timeout=2.0)
+        mock_popen.assert_not_called()
+        mock_write_cache.assert_called_once_with(agent.MODELS_CACHE_PATH, {"url": "http://ollama:11434/", "models": expected})
+
+    @patch("app.agent.subprocess.Popen")
+    @patch("app.agent.write_cache")
+    @patch("app.agent.read_cache", return_value=None)
+    @patch("app.agent.urllib.request.urlopen", side_effect=urllib.error.URLError("refused"))
+    def test_get_models_falls_back_to_cli(self, mock_urlopen, mock_read_cache, mock_write_cache, mock_popen):
+        process = mock_popen.return_value.__enter__.return_value
+        process.stdout = io.StringIO("NAME ID SIZE MODIFIED\nllama3:latest abc 4.7GB 2 days ago\n\nmistral def 4.1GB 3 days ago\n")
+        process.returncode = 0
+        models = agent.get_ollama_models_with_tags()
+        expected = [("llama3:latest", "llama3", "latest"), ("mistral", "mistral", "default")]
+        self.assertEqual(models, expected)
+        mock_popen.assert_called_once()
+
+    @patch("app.agent.subprocess.Popen")
+    @patch("app.agent.write_cache")
+    @patch("app.agent.read_cache", return_value=None)
+    @patch("app.agent.urllib.request.urlopen")
+    def test_get_models_http_error_falls_back_to_cli(self, mock_urlopen, mock_read_cache, mock_write_cache, mock_popen):
+        process = mock_popen.return_value.__enter__.return_value
+        process.returncode = 0
+        for error in (http.client.BadStatusLine("garbage"), http.client.IncompleteRead(b"{")):
+            with self.subTest(error=type(error).__name__):
+                mock_urlopen.side_effect = error
+                process.stdout = io.StringIO("NAME ID SIZE MODIFIED\nllama3:latest abc 4.7GB 2 days ago\n")
+                self.assertEqual(agent.get_ollama_models_with_tags(), [("llama3:latest", "llama3", "latest")])
+        self.assertEqual(mock_popen.call_count, 2)
+
+    @patch("app.agent.subprocess.Popen")
+    @patch("app.agent.write_cache")
+    @patch("app.agent.read_cache", return_value=None)
+    @patch("app.agent.urllib.request.urlopen")
+    def test_get_models_unexpected_api_response_falls_back_to_cli(self, mock_urlopen, mock_read_cache, mock_write_cache, mock_popen):
+        process = mock_popen.return_value.__enter__.return_value
+        process.returncode = 0
+        for payload in ([], {"models": {}}, {"models": ["llama3"]}, {"models": [{}]}):
+            with self.subTest(payload=payload):
+                mock_urlopen.return_value = io.BytesIO(json.dumps(payload).encode())
+                process.stdout = io.StringIO("NAME ID SIZE MODIFIED\nllama3:latest abc 4.7GB 2 days ago\n")
+                self.assertEqual(agent.get_ollama_models_with_tags(), [("llama3:latest", "llama3", "latest")])
+        self.assertEqual(mock_popen.call_count, 4)
+
+    @patch("app.agent.subprocess.Popen")
+    @patch("app.agent.write_cache")
+    @patch("app.agent.read_cache", return_value=None)
+    @patch("app.agent.urllib.request.urlopen")
+    def test_get_models_api_without_models(self, mock_urlopen, mock_read_cache, mock_write_cache, mock_popen):
+        mock_urlopen.return_value = io.BytesIO(b'{"models": []}')
+        with patch("builtins.print") as mock_print:
+            self.assertEqual(agent.get_ollama_models_with_tags(), [("llama3", "llama3", "latest")])
+        mock_print.assert_any_call("No Ollama models found")
+        mock_popen.assert_not_called()
+        mock_write_cache.assert_not_called()
+
+    @patch("app.agent.subprocess.Popen", side_effect=FileNotFoundError("ollama"))
+    @patch("app.agent.write_cache")
+    @patch("app.agent.read_cache", return_value=None)
+    @patch("app.agent.urllib.request.urlopen", side_effect=urllib.error.URLError("refused"))
+    def test_get_models_default_when_ollama_unavailable(self, mock_urlopen, mock_read_cache, mock_write_cache, mock_popen):
+        self.assertEqual(agent.get_ollama_models_with_tags(), [("llama3", "llama3", "latest")])
+        mock_write_cache.assert_not_called()
+
+    def write_history(self, lines):
+        with tempfile.NamedTemporaryFile('wb', suffix='.history', delete=False) as f:
+            f.writelines(lines)
+        self.addCleanup(os.unlink, f.name)
+        return f.name
+
+    @staticmethod
+    def read_history(path):
+        with open(path, 'rb') as f:
+            return f.read().splitlines()
 
+    @patch("app.agent.readline")
+    def test_load_history_tails_long_file(self, mock_readline):
+        history_file = self.write_history(f"question\\040{i}\n".encode() for i in range(agent.HISTORY_LENGTH + 500))
+        loaded = []
+        mock_readline.read_history_file.side_effect = lambda path: loaded.append(self.read_history(path))
+        agent.load_history(history_file)
+        mock_readline.clear_history.assert_called_once()
+        # readline reads a temporary file holding only the tail, still in its own encoding
+        self.assertNotEqual(mock_readline.read_history_file.call_args[0][0], history_file)
+        self.assertEqual(len(loaded[0]), agent.HISTORY_LENGTH)
+        self.assertEqual(loaded[0][0], b"question\\040500")
+        self.assertEqual(loaded[0][-1], f"question\\040{agent.HISTORY_LENGTH + 499}".encode())
+        self.assertFalse(os.path.exists(mock_readline.read_history_file.call_args[0][0]))
+
+    @patch("app.agent.readline")
+    def test_load_history_keeps_libedit_header(self, mock_readline):
+        lines = [b"_HiStOrY_V2_\n"] + [f"q{i}\n".encode() for i in range(agent.HISTORY_LENGTH + 1)]
+        loaded = []
+        mock_readline.read_history_file.side_effect = lambda path: loaded.append(self.read_history(path))
+        agent.load_history(self.write_history(lines))
+        self.assertEqual(loaded[0][0], b"_HiStOrY_V2_")
+        self.assertEqual(loaded[0][1], b"q1")
+        self.assertEqual(len(loaded[0]), agent.HISTORY_LENGTH + 1)
+
+    @patch("app.agent.readline")
+    def test_load_history_reads_short_file_directly(self, mock_readline):
+        history_file = self.write_history([b"_HiStOrY_V2_\n"] + [b"q\n"] * agent.HISTORY_LENGTH)
+        agent.load_history(history_file)
+        mock_readline.read_history_file.assert_called_once_with(history_file)
+        mock_readline.clear_history.assert_not_called()
+
+    @patch("app.agent.readline")
+    def test_save_history_truncates(self, mock_readline):
+        mock_readline.write_history_file.side_effect = PermissionError("denied")
+        # Errors while saving at exit are ignored
+        agent.save_history("/tmp/history")
+        mock_readline.set_history_length.assert_called_once_with(agent.HISTORY_LENGTH)
+        mock_readline.write_history_file.assert_called_once_with("/tmp/history")
+
+    @patch("app.agent.is_interactive", return_value=True)
+    @patch("app.agent.atexit")
+    @patch("app.agent.os.path.exists", return_value=False)
+    @patch("app.agent.readline")
+    def test_setup_readline_registers_history_save(self, mock_readline, mock_exists, mock_atexit, mock_is_interactive):
+        agent.setup_readline()
+        mock_atexit.register.assert_called_once_with(agent.save_history, agent.HISTORY_FILE)
+
+    @patch("app.agent.is_interactive", return_value=True)
+    @patch("app.agent.atexit")
+    @patch("app.agent.os.path.exists", return_value=True)
+    @patch("app.agent.load_history", side_effect=PermissionError("denied"))
+    @patch("app.agent.readline")
+    def test_setup_readline_does_not_save_unreadable_history(self, mock_readline, mock_load_history, mock_exists, mock_atexit, mock_is_interactive):
+        agent.setup_readline()
+        mock_readline.set_history_length.assert_called_once_with(agent.HISTORY_LENGTH)
+        mock_atexit.register.assert_not_called()
+
+    @patch("app.agent.print_banner")
+    @patch("app.agent.os.system")
+    @patch("app.agent.os.name", "posix")
+    def test_clear_screen_uses_ansi_escape(self, mock_system, mock_print_banner):
+        with patch("sys.stdout", new_callable=io.StringIO) as mock_stdout:
+            agent.clear_screen()
+        self.assertEqual(mock_stdout.getvalue(), "\x1b[2J\x1b[H")
+        mock_system.assert_not_called()
+        mock_print_banner.assert_called_once()
+
+    @patch("app.agent.is_interactive", return_value=True)
+    def test_run_basic_agent_inputs(self, mock_is_interactive):
+        cases = [
+            (["exit"], None),  # Should not call agent if user types 'exit' immediately
+            (["hello", "exit"], "hello"),
+            (KeyboardInterrupt, None),  # Should not raise, should print Exiting
+            (EOFError, None),  # Should not raise, should print Exiting
+        ]
+        for inputs, expected_prompt in cases:
+            with self.subTest(inputs=inputs), patch("app.agent.input", side_effect=inputs):
+                mock_agent = MagicMock()
+                agent.run_basic_agent(mock_agent)
+                if expected_prompt is None:
+                    mock_agent.assert_not_called()
+                else:
+                    mock_agent.assert_called_once_with(expected_prompt)
+
+    @patch("app.agent.is_interactive", return_value=True)
     @patch("app.agent.input", side_effect=["clear", "exit"])
     @patch("app.agent.clear_screen")
-    def test_run_basic_agent_clear(self, mock_clear_screen, mock_input):
+    def test_run_basic_agent_clear(self, mock_clear_screen, mock_input, mock_is_interactive):
         mock_agent = MagicMock()
         agent.run_basic_agent(mock_agent)
         mock_clear_screen.assert_called_once()
         mock_agent.assert_not_called()  # Should not call agent for 'clear', nor for 'exit'
 
-    @patch("app.agent.input", side_effect=["hello", "exit"])
-    def test_run_basic_agent_ask(self, mock_input):
-        mock_agent = MagicMock()
+    @patch("app.agent.is_interactive", return_value=True)
+    @patch("app.agent.input", side_effect=["hello", "again"])
+    def test_run_basic_agent_interrupt_while_answering(self, mock_input, mock_is_interactive):
+        mock_agent = MagicMock(side_effect=KeyboardInterrupt)
+        # Should not raise, and should stop asking for input
         agent.run_basic_agent(mock_agent)
         mock_agent.assert_called_once_with("hello")
+        self.assertEqual(mock_input.call_count, 1)
 
-    @patch("app.agent.input", side_effect=KeyboardInterrupt)
-    def test_run_basic_agent_keyboard_interrupt(self, mock_input):
+    @patch("app.agent.is_interactive", return_value=False)
+    @patch("app.agent.input")
+    def test_run_basic_agent_non_interactive(self, mock_input, mock_is_interactive):
         mock_agent = MagicMock()
-        # Should not raise, should print Exiting
-        agent.run_basic_agent(mock_agent)
-        mock_agent.assert_not_called()
+        with patch("app.agent.sys.stdin", io.StringIO("hello\nworld\n")):
+            agent.run_basic_agent(mock_agent)
+        mock_input.assert_not_called()
+        self.assertEqual(mock_agent.call_args_list, [call("hello"), call("world")])
 
-    @patch("app.agent.input", side_effect=EOFError)
-    def test_run_basic_agent_eof(self, mock_input):
-        mock_agent = MagicMock()
-        # Should not raise, should print Exiting
-        agent.run_basic_agent(mock_agent)
-        mock_agent.assert_not_called()
+    @patch("app.agent.is_interactive", return_value=False)
+    @patch("app.agent.atexit")
+    @patch("app.agent.readline")
+    def test_setup_readline_skipped_when_not_interactive(self, mock_readline, mock_atexit, mock_is_interactive):
+        agent.setup_readline()
+        mock_readline.set_history_length.assert_not_called()
+        mock_readline.parse_and_bind.assert_not_called()
+        mock_atexit.register.assert_not_called()
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,6 +2,7 @@
 """
 Unit tests for banner.py and version.py
 """
+import io
 import unittest
 from app import banner, version
 from unittest.mock import patch
@@ -12,14 +13,18 @@ class TestBanner(unittest.TestCase):
         self.assertTrue(isinstance(version.VERSION, str))
         self.assertTrue(len(version.VERSION) > 0)
 
-    @patch("builtins.print")
-    def test_print_banner_prints(self, mock_print):
+    @patch("sys.stdout", new_callable=io.StringIO)
+    def test_print_banner_prints(self, mock_stdout):
         banner.print_banner()
-        # Should print at least once
-        self.assertTrue(mock_print.called)
-        # Should include the version string in the output
-        printed_args = " ".join(str(arg) for call in mock_print.call_args_list for arg in call[0])
-        self.assertIn(version.VERSION, printed_args)
+        # Should print the banner, including the version string
+        self.assertEqual(mock_stdout.getvalue(), banner.get_banner() + "\n")
+        self.assertIn(version.VERSION, mock_stdout.getvalue())
+
+    def test_get_banner_ends_with_version(self):
+        self.assertTrue(banner.get_banner().endswith(f"\nv{version.VERSION}\n"))
+
+    def test_get_banner_is_cached(self):
+        self.assertIs(banner.get_banner(), banner.get_banner())
 
 if __name__ == "__main__":
     unittest.main()
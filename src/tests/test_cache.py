@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Unit tests for cache.py (on-disk JSON cache helpers)
+"""
+import os
+import time
+import tempfile
+import unittest
+from app import cache
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tempdir.name, "sub", "data.json")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_write_then_read(self):
+        cache.write_cache(self.cache_path, [["llama3:latest", "llama3", "latest"]])
+        self.assertEqual(cache.read_cache(self.cache_path, 60), [["llama3:latest", "llama3", "latest"]])
+        # No temporary files should be left behind
+        self.assertEqual(os.listdir(os.path.dirname(self.cache_path)), ["data.json"])
+
+    def test_read_missing(self):
+        self.assertIsNone(cache.read_cache(self.cache_path, 60))
+
+    def test_read_expired(self):
+        cache.write_cache(self.cache_path, {"a": 1})
+        old = time.time() - 120
+        os.utime(self.cache_path, (old, old))
+        self.assertIsNone(cache.read_cache(self.cache_path, 60))
+
+    def test_read_invalidated_by_not_before(self):
+        cache.write_cache(self.cache_path, {"a": 1})
+        self.assertIsNone(cache.read_cache(self.cache_path, 60, not_before=time.time() + 10))
+        self.assertEqual(cache.read_cache(self.cache_path, 60, not_before=time.time() - 10), {"a": 1})
+
+    def test_read_corrupt(self):
+        os.makedirs(os.path.dirname(self.cache_path))
+        with open(self.cache_path, 'w') as f:
+            f.write("{ not json")
+        self.assertIsNone(cache.read_cache(self.cache_path, 60))
+
+    def test_clear_cache(self):
+        cache.write_cache(self.cache_path, {"a": 1})
+        cache.clear_cache(self.cache_path)
+        self.assertFalse(os.path.exists(self.cache_path))
+        # Clearing a missing cache is a no-op
+        cache.clear_cache(self.cache_path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Unit tests for conversation.py (token-aware conversation management)
+"""
+import unittest
+from unittest.mock import MagicMock
+from app.conversation import TokenWindowConversationManager, estimate_tokens
+
+def make_turns(count, chars=400):
+    messages = []
+    for i in range(count):
+        messages.append({"role": "user", "content": [{"text": f"q{i}".ljust(chars)}]})
+        messages.append({"role": "assistant", "content": [{"text": f"a{i}".ljust(chars)}]})
+    return messages
+
+def make_tool_turn(question, results=2, chars=4000):
+    messages = [{"role": "user", "content": [{"text": question}]}]
+    for i in range(results):
+        messages.append({"role": "assistant", "content": [{"toolUse": {"toolUseId": f"t{i}", "name": "read_file", "input": {}}}]})
+        messages.append({"role": "user", "content": [{"toolResult": {"toolUseId": f"t{i}", "status": "success", "content": [{"text": "x" * chars}]}}]})
+    messages.append({"role": "assistant", "content": [{"text": "done"}]})
+    return messages
+
+class TestTokenWindowConversationManager(unittest.TestCase):
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens(make_turns(1)), 200)
+        self.assertGreater(estimate_tokens([{"role": "user", "content": [{"toolResult": {"content": [{"text": "x" * 40}]}}]}]), 10)
+
+    def test_trims_oldest_turns_to_budget(self):
+        agent = MagicMock()
+        agent.messages = make_turns(5)
+        manager = TokenWindowConversationManager(window_size=40, max_tokens=450)
+        manager.apply_management(agent)
+        # Two turns (400 tokens) fit the budget, the oldest three are evicted
+        self.assertEqual(len(agent.messages), 4)
+        self.assertEqual(agent.messages[0]["content"][0]["text"].strip(), "q3")
+        self.assertLessEqual(estimate_tokens(agent.messages), 450)
+
+    def test_within_budget_untouched(self):
+        agent = MagicMock()
+        agent.messages = make_turns(2)
+        manager = TokenWindowConversationManager(window_size=40, max_tokens=1000)
+        manager.apply_management(agent)
+        self.assertEqual(len(agent.messages), 4)
+
+    def test_keeps_latest_turn_over_budget(self):
+        agent = MagicMock()
+        agent.messages = make_turns(3, chars=4000)
+        manager = TokenWindowConversationManager(window_size=40, max_tokens=100)
+        manager.apply_management(agent)
+        # The latest exchange is always kept, even if it alone exceeds the budget
+        self.assertEqual([m["content"][0]["text"].strip() for m in agent.messages], ["q2", "a2"])
+
+    def test_keeps_latest_question_with_tool_results_over_budget(self):
+        agent = MagicMock()
+        agent.messages = make_turns(1, chars=40) + make_tool_turn("What is in file A and B?")
+        manager = TokenWindowConversationManager(window_size=40, max_tokens=500)
+        manager.apply_management(agent)
+        # Older turns go, but the question and its tool calls stay together
+        self.assertEqual(agent.messages, make_tool_turn("What is in file A and B?"))
+
+if __name__ == "__main__":
+    unittest.main()
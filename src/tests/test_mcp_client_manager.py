@@ -2,32 +2,36 @@
 """
 Unit tests for mcp_client_manager.py (MCPClientManager)
 """
+import os
+import json
+import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import MagicMock, patch
-from app.mcp_client_manager import MCPClientManager
+from unittest.mock import MagicMock, Mock, patch
+from app.mcp_client_manager import MCPClientManager, get_tools_cache_path
+from app.mcp_config import MCPConfigManager, MCPServerConfig
 
 class TestMCPClientManager(unittest.TestCase):
     def setUp(self):
         # Mock MCPConfigManager
-        self.mock_config_manager = MagicMock()
+        self.mock_config_manager = Mock()
         self.mock_config_manager.list_servers.return_value = ["server1", "server2"]
         # Mock server configs
-        mock_server_config1 = MagicMock()
+        mock_server_config1 = Mock()
         mock_server_config1.command = "/bin/echo"
         mock_server_config1.args = ["hello"]
         mock_server_config1.env = {"FOO": "bar"}
-        mock_server_config2 = MagicMock()
+        mock_server_config2 = Mock()
         mock_server_config2.command = "/bin/ls"
         mock_server_config2.args = ["-l"]
         mock_server_config2.env = {"BAR": "baz"}
-        self.mock_config_manager.get_server_config.side_effect = lambda name: {
-            "server1": mock_server_config1,
-            "server2": mock_server_config2
-        }[name]
-
-    @patch("app.mcp_client_manager.MCPClient")
-    @patch("app.mcp_client_manager.stdio_client")
-    @patch("app.mcp_client_manager.StdioServerParameters")
+        server_configs = {"server1": mock_server_config1, "server2": mock_server_config2}
+        self.mock_config_manager.get_server_config.side_effect = server_configs.get
+
+    @patch("strands.tools.mcp.MCPClient")
+    @patch("mcp.stdio_client")
+    @patch("mcp.StdioServerParameters")
     def test_create_clients_success(self, mock_params, mock_stdio_client, mock_mcp_client):
         # Setup mocks
         mock_mcp_client.side_effect = lambda func: f"MCPClient({func})"
@@ -38,6 +42,29 @@ class TestMCPClientManager(unittest.TestCase):
         self.mock_config_manager.list_servers.assert_called_once()
         self.assertEqual(self.mock_config_manager.get_server_config.call_count, 2)
 
+    @patch("strands.tools.mcp.MCPClient")
+    @patch("mcp.stdio_client", side_effect=lambda params: params)
+    @patch("mcp.StdioServerParameters", side_effect=lambda **kwargs: kwargs)
+    def test_create_clients_binds_each_server_config(self, mock_params, mock_stdio_client, mock_mcp_client):
+        mock_mcp_client.side_effect = lambda factory: factory
+        manager = MCPClientManager(self.mock_config_manager)
+        factories = manager.create_clients()
+        # Each client factory must launch its own server, not the last one configured
+        self.assertEqual([factory() for factory in factories], [
+            {"command": "/bin/echo", "args": ["hello"], "env": {"FOO": "bar"}},
+            {"command": "/bin/ls", "args": ["-l"], "env": {"BAR": "baz"}},
+        ])
+
+    def test_init_from_config_path(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({"server1": {"command": "/bin/echo", "args": ["hello"]}}, f)
+        try:
+            manager = MCPClientManager(f.name)
+        finally:
+            os.unlink(f.name)
+        self.assertIsInstance(manager.config_manager, MCPConfigManager)
+        self.assertEqual(manager.config_manager.list_servers(), ["server1"])
+
     def test_create_clients_no_config_manager(self):
         manager = MCPClientManager(None)
         with self.assertRaises(Exception) as ctx:
@@ -53,7 +80,7 @@ class TestMCPClientManager(unittest.TestCase):
         self.assertIn("Server config for server1 not found", str(ctx.exception))
 
     def test_create_clients_missing_command_or_args(self):
-        bad_config = MagicMock()
+        bad_config = Mock()
         bad_config.command = None
         bad_config.args = None
         bad_config.env = {"FOO": "bar"}
@@ -65,7 +92,7 @@ class TestMCPClientManager(unittest.TestCase):
         self.assertIn("missing 'command' or 'args'", str(ctx.exception))
 
     def test_create_clients_missing_env(self):
-        bad_config = MagicMock()
+        bad_config = Mock()
         bad_config.command = "/bin/echo"
         bad_config.args = ["hello"]
         bad_config.env = None
@@ -76,5 +103,156 @@ class TestMCPClientManager(unittest.TestCase):
             manager.create_clients()
         self.assertIn("missing 'env'", str(ctx.exception))
 
+    def test_tools_cache_path_depends_on_config(self):
+        config = MCPServerConfig("server1", "/bin/echo", ["hello"], {"FOO": "bar"})
+        same = MCPServerConfig("renamed", "/bin/echo", ["hello"], {"FOO": "bar"})
+        other_env = MCPServerConfig("server1", "/bin/echo", ["hello"], {"FOO": "baz"})
+        self.assertEqual(get_tools_cache_path(config), get_tools_cache_path(same))
+        self.assertNotEqual(get_tools_cache_path(config), get_tools_cache_path(other_env))
+
+    @patch("app.mcp_client_manager.write_cache")
+    @patch("app.mcp_client_manager.read_cache")
+    def test_list_tools_cache_hit(self, mock_read_cache, mock_write_cache):
+        mock_read_cache.return_value = [{"name": "echo", "description": "Echo input", "inputSchema": {"type": "object"}}]
+        mock_client = Mock()
+        manager = MCPClientManager(self.mock_config_manager)
+        manager.clients = {"server1": mock_client}
+        tools = manager.list_tools("server1")
+        self.assertEqual([tool.tool_name for tool in tools], ["echo"])
+        self.assertIs(tools[0].mcp_client, mock_client)
+        mock_client.list_tools_sync.assert_not_called()
+        mock_write_cache.assert_not_called()
+
+    @patch("app.mcp_client_manager.write_cache")
+    @patch("app.mcp_client_manager.read_cache")
+    def test_list_tools_invalid_cache_queries_server(self, mock_read_cache, mock_write_cache):
+        mock_tool = Mock()
+        mock_tool.mcp_tool.model_dump.return_value = {"name": "echo"}
+        mock_client = Mock()
+        mock_client.list_tools_sync.return_value = [mock_tool]
+        manager = MCPClientManager(self.mock_config_manager)
+        manager.clients = {"server1": mock_client}
+        for cached in ([{"description": "no name"}], 42):
+            with self.subTest(cached=cached), patch("builtins.print"):
+                mock_read_cache.return_value = cached
+                self.assertEqual(manager.list_tools("server1"), [mock_tool])
+        self.assertEqual(mock_client.list_tools_sync.call_count, 2)
+        self.assertEqual(mock_write_cache.call_args[0][1], [{"name": "echo"}])
+
+    @patch("app.mcp_client_manager.write_cache")
+    @patch("app.mcp_client_manager.read_cache")
+    def test_list_tools_refresh(self, mock_read_cache, mock_write_cache):
+        mock_tool = Mock()
+        mock_tool.mcp_tool.model_dump.return_value = {"name": "echo"}
+        mock_client = Mock()
+        mock_client.list_tools_sync.return_value = [mock_tool]
+        manager = MCPClientManager(self.mock_config_manager)
+        manager.clients = {"server1": mock_client}
+        self.assertEqual(manager.list_tools("server1", refresh=True), [mock_tool])
+        mock_read_cache.assert_not_called()
+        mock_write_cache.assert_called_once()
+        self.assertEqual(mock_write_cache.call_args[0][1], [{"name": "echo"}])
+
+    def test_list_all_tools(self):
+        manager = MCPClientManager(self.mock_config_manager)
+        manager.clients = {"server1": Mock(), "server2": Mock(), "server3": Mock()}
+        tools = {
+            "server1": [Mock(tool_name="a")],
+            "server2": RuntimeError("server down"),
+            "server3": [Mock(tool_name="b"), Mock(tool_name="c")],
+        }
+        def list_tools(name, refresh):
+            if isinstance(tools[name], Exception):
+                raise tools[name]
+            return tools[name]
+        with patch.object(manager, "list_tools", side_effect=list_tools) as mock_list_tools:
+            all_tools = manager.list_all_tools(refresh=True)
+        # Failing servers are skipped and the remaining tools keep server order
+        self.assertEqual([tool.tool_name for tool in all_tools], ["a", "b", "c"])
+        self.assertEqual(mock_list_tools.call_count, 3)
+
+    def test_list_all_tools_timeout_retries_once(self):
+        manager = MCPClientManager(self.mock_config_manager)
+        manager.clients = {"slow": Mock(), "flaky": Mock(), "fast": Mock()}
+        release = threading.Event()
+        calls = {"slow": 0, "flaky": 0, "fast": 0}
+        def list_tools(name, refresh):
+            calls[name] += 1
+            if name == "slow" or (name == "flaky" and calls[name] == 1):
+                release.wait(5)
+            return [Mock(tool_name=name)]
+        try:
+            with patch.object(manager, "list_tools", side_effect=list_tools):
+                all_tools = manager.list_all_tools(timeout=0.1)
+        finally:
+            release.set()
+        # The slow server is skipped after one retry; the flaky one succeeds on retry
+        self.assertEqual([tool.tool_name for tool in all_tools], ["flaky", "fast"])
+        self.assertEqual(calls["slow"], 2)
+        self.assertEqual(calls["flaky"], 2)
+        self.assertEqual(calls["fast"], 1)
+
+    def test_list_all_tools_waits_for_hung_servers_in_parallel(self):
+        manager = MCPClientManager(self.mock_config_manager)
+        manager.clients = {f"hung{i}": Mock() for i in range(4)}
+        release = threading.Event()
+        def list_tools(name, refresh):
+            release.wait(5)
+            return []
+        try:
+            with patch.object(manager, "list_tools", side_effect=list_tools):
+                start = time.monotonic()
+                all_tools = manager.list_all_tools(timeout=0.2)
+                elapsed = time.monotonic() - start
+        finally:
+            release.set()
+        self.assertEqual(all_tools, [])
+        # One shared wait and one shared retry, not two waits per server
+        self.assertLess(elapsed, 1.0)
+
+    def test_list_all_tools_accepts_original_call_finishing_during_retry(self):
+        manager = MCPClientManager(self.mock_config_manager)
+        manager.clients = {"late": Mock()}
+        retry_started = threading.Event()
+        release = threading.Event()
+        calls = []
+        def list_tools(name, refresh):
+            calls.append(name)
+            if len(calls) == 1:
+                # The original call answers as soon as the retry has been sent
+                retry_started.wait(5)
+                return [Mock(tool_name="original")]
+            retry_started.set()
+            release.wait(5)
+            return [Mock(tool_name="retry")]
+        try:
+            with patch.object(manager, "list_tools", side_effect=list_tools):
+                all_tools = manager.list_all_tools(timeout=0.2)
+        finally:
+            release.set()
+        self.assertEqual([tool.tool_name for tool in all_tools], ["original"])
+        self.assertEqual(len(calls), 2)
+
+    def test_list_all_tools_no_clients(self):
+        self.assertEqual(MCPClientManager(self.mock_config_manager).list_all_tools(), [])
+
+    def test_context_manager(self):
+        manager = MCPClientManager(self.mock_config_manager)
+        good_client = MagicMock()
+        bad_client = MagicMock()
+        bad_client.__enter__.side_effect = RuntimeError("spawn failed")
+        manager.clients = {"server1": good_client, "server2": bad_client}
+        with manager as entered:
+            self.assertIs(entered, manager)
+            # Clients that failed to start are dropped
+            self.assertEqual(list(manager.clients), ["server1"])
+        good_client.__enter__.assert_called_once()
+        good_client.__exit__.assert_called_once_with(None, None, None)
+        bad_client.__exit__.assert_not_called()
+
+    def test_context_manager_no_clients(self):
+        with MCPClientManager(self.mock_config_manager) as manager:
+            self.assertEqual(manager.clients, {})
+
 if __name__ == "__main__":
     unittest.main()
@@ -6,36 +6,75 @@ import os
 import tempfile
 import json
 import unittest
+from unittest.mock import patch
 from app.mcp_config import MCPConfigManager, MCPServerConfig
 
 class TestMCPConfigManager(unittest.TestCase):
-    def setUp(self):
-        # Create a temporary config file
-        self.tempfile = tempfile.NamedTemporaryFile(delete=False, mode='w+', suffix='.json')
-        self.config_data = {
-            "server1": {
-                "command": "/bin/echo",
-                "args": ["hello"],
-                "env": {"FOO": "bar"}
-            },
-            "server2": {
-                "command": "/bin/ls",
-                "args": ["-l"]
-            }
+    config_data = {
+        "server1": {
+            "command": "/bin/echo",
+            "args": ["hello"],
+            "env": {"FOO": "bar"}
+        },
+        "server2": {
+            "command": "/bin/ls",
+            "args": ["-l"]
         }
-        json.dump(self.config_data, self.tempfile)
-        self.tempfile.close()
-        self.manager = MCPConfigManager(self.tempfile.name)
+    }
+    # Serialized once; every test that needs the config on disk writes these bytes
+    config_bytes = json.dumps(config_data).encode()
 
-    def tearDown(self):
-        os.unlink(self.tempfile.name)
+    @classmethod
+    def setUpClass(cls):
+        # Config files live in one temporary directory that is removed in bulk after the class runs
+        cls.tempdir = tempfile.TemporaryDirectory()
+        # Only the file loading tests touch the disk; write their config once for the whole class
+        cls.config_path = cls.write_config("config.json", cls.config_bytes)
+        # The lookup tests only read from the manager, so they share one loaded instance
+        cls.manager = MCPConfigManager.load_from_dict(cls.config_data)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tempdir.cleanup()
+
+    @classmethod
+    def write_config(cls, name, content):
+        path = os.path.join(cls.tempdir.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
 
     def test_load_config_success(self):
-        self.assertTrue(self.manager.load_config())
-        self.assertEqual(set(self.manager.list_servers()), {"server1", "server2"})
+        manager = MCPConfigManager(self.config_path)
+        self.assertTrue(manager.load_config())
+        self.assertEqual(set(manager.list_servers()), {"server1", "server2"})
+        self.assertEqual(manager.get_server_config("server1").env, {"FOO": "bar"})
+
+    def test_load_config_replaces_servers(self):
+        manager = MCPConfigManager(self.config_path)
+        manager.servers["stale"] = MCPServerConfig("stale", "/bin/true", [], {})
+        self.assertTrue(manager.load_config())
+        self.assertNotIn("stale", manager.list_servers())
+
+    def test_load_config_memoizes_parse(self):
+        path = self.write_config("memoized.json", self.config_bytes)
+        with patch("app.mcp_config.json_loads", wraps=json.loads) as mock_loads:
+            first = MCPConfigManager(path)
+            second = MCPConfigManager(path)
+            self.assertTrue(first.load_config())
+            self.assertTrue(second.load_config())
+            self.assertEqual(mock_loads.call_count, 1)
+            # Loaded configs don't share the cached data
+            first.get_server_config("server1").args.append("world")
+            self.assertEqual(second.get_server_config("server1").args, ["hello"])
+            # Changing the file invalidates the cached parse
+            with open(path, 'w') as f:
+                json.dump({"server3": {"command": "/bin/true", "args": []}}, f)
+            self.assertTrue(first.load_config())
+            self.assertEqual(first.list_servers(), ["server3"])
+            self.assertEqual(mock_loads.call_count, 2)
 
     def test_get_server_config(self):
-        self.manager.load_config()
         config = self.manager.get_server_config("server1")
         self.assertIsInstance(config, MCPServerConfig)
         self.assertEqual(config.command, "/bin/echo")
@@ -43,17 +82,14 @@ class TestMCPConfigManager(unittest.TestCase):
         self.assertEqual(config.env, {"FOO": "bar"})
 
     def test_get_server_config_missing(self):
-        self.manager.load_config()
         self.assertIsNone(self.manager.get_server_config("notfound"))
 
     def test_list_servers(self):
-        self.manager.load_config()
         servers = self.manager.list_servers()
         self.assertIn("server1", servers)
         self.assertIn("server2", servers)
 
     def test_get_all_servers(self):
-        self.manager.load_config()
         all_servers = self.manager.get_all_servers()
         self.assertIsInstance(all_servers, dict)
         self.assertIn("server1", all_servers)
@@ -61,21 +97,30 @@ class TestMCPConfigManager(unittest.TestCase):
 
     def test_load_config_invalid_json(self):
         # Write invalid JSON
-        with open(self.tempfile.name, 'w') as f:
-            f.write("{ invalid json }")
-        self.assertFalse(self.manager.load_config())
+        path = self.write_config("invalid.json", b"{ invalid json }")
+        self.assertFalse(MCPConfigManager(path).load_config())
 
     def test_load_config_missing_file(self):
-        manager = MCPConfigManager("/tmp/does_not_exist.json")
+        manager = MCPConfigManager(os.path.join(self.tempdir.name, "does_not_exist.json"))
         self.assertFalse(manager.load_config())
 
     def test_load_config_missing_fields(self):
-        # Write config missing 'command' and 'args'
+        # Config missing 'command' and 'args'
         bad_config = {"badserver": {"foo": "bar"}}
-        with open(self.tempfile.name, 'w') as f:
-            json.dump(bad_config, f)
-        self.assertTrue(self.manager.load_config())
-        self.assertNotIn("badserver", self.manager.list_servers())
+        with patch("builtins.print") as mock_print:
+            manager = MCPConfigManager.load_from_dict(bad_config)
+        self.assertNotIn("badserver", manager.list_servers())
+        # The warning names the missing fields
+        self.assertIn("['args', 'command']", mock_print.call_args[0][0])
+
+    def test_load_config_partial_fields(self):
+        bad_config = {"server1": {"command": "/bin/echo"}, "server2": ["not", "a", "dict"]}
+        with patch("builtins.print") as mock_print:
+            manager = MCPConfigManager.load_from_dict(bad_config)
+        self.assertEqual(manager.list_servers(), [])
+        messages = [c[0][0] for c in mock_print.call_args_list]
+        self.assertIn("['args']", messages[0])
+        self.assertIn("['args', 'command']", messages[1])
 
 if __name__ == "__main__":
     unittest.main()